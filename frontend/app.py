@@ -1,10 +1,10 @@
-import streamlit as st
 import time
+import pandas as pd
+import streamlit as st
+from components.charts import create_icu_forecast_chart, create_oxygen_depletion_chart
 from database.db_connection import (
     fetch_hospital_data, 
-    fetch_city_summary, 
-    get_hospital_by_name,
-    get_all_hospital_names
+    fetch_city_summary
 )
 
 # ============================================================================
@@ -17,64 +17,139 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# ============================================================================
-# LOADING STATE
-# ============================================================================
-if 'loaded' not in st.session_state:
-    with st.spinner('🏥 Initializing CodeBlue...'):
-        time.sleep(1)
-        st.session_state.loaded = True
-
 # ============================================================================
 # LOAD CUSTOM CSS
 # ============================================================================
-def load_css():
+@st.cache_resource
+def _css_blob():
+    """Read the stylesheet once per process"""
     with open('styles/custom.css') as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        return f'<style>{f.read()}</style>'
+
+def load_css():
+    st.markdown(_css_blob(), unsafe_allow_html=True)
 
 load_css()
 
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+ALERT_STYLE = {
+    'CRITICAL': dict(
+        color='#DC2626',
+        bg='linear-gradient(135deg, #DC2626 0%, #991B1B 100%)',
+        emoji='🔴',
+        border='#FEE2E2',
+        shadow='rgba(220, 38, 38, 0.5)',
+        label='Critical'
+    ),
+    'WATCH': dict(
+        color='#F97316',
+        bg='linear-gradient(135deg, #F97316 0%, #EA580C 100%)',
+        emoji='🟡',
+        border='#FED7AA',
+        shadow='rgba(249, 115, 22, 0.5)',
+        label='Elevated'
+    ),
+    'NORMAL': dict(
+        color='#10B981',
+        bg='linear-gradient(135deg, #10B981 0%, #059669 100%)',
+        emoji='🟢',
+        border='#D1FAE5',
+        shadow='rgba(16, 185, 129, 0.5)',
+        label='Normal'
+    ),
+}
+
+def normalize_alert_level(alert_level):
+    """Uppercase alert level for comparison (handles case sensitivity)"""
+    return str(alert_level).upper() if alert_level else 'NORMAL'
+
+def get_alert_style(alert_upper):
+    """Get style dict for a normalized alert level (NORMAL for unknown values)"""
+    return ALERT_STYLE.get(alert_upper, ALERT_STYLE['NORMAL'])
+
+def get_alert_color(alert_upper):
+    """Get color for a normalized alert level"""
+    return get_alert_style(alert_upper)['color']
+
+def get_alert_emoji(alert_upper):
+    """Get emoji for a normalized alert level"""
+    return get_alert_style(alert_upper)['emoji']
+
+KPI_HTML = (
+    '<div class="public-metric">'
+    '<div class="public-metric-label">{label}</div>'
+    '<div class="public-metric-value">{value}</div>'
+    '{delta_html}'
+    '</div>'
+)
+
+KPI_DELTA_HTML = '<div class="kpi-delta" style="color: {color};">{arrow} {delta}</div>'
+
+def kpi_html(label, value, delta, delta_color="normal"):
+    """Render one metric card; delta_color follows st.metric semantics"""
+    if delta is None:
+        # st.metric shows no delta row for None
+        return KPI_HTML.format(label=label, value=value, delta_html='')
+    delta = str(delta)
+    is_down = delta.startswith('-')
+    if delta_color == "off":
+        color = '#94A3B8'
+    elif is_down == (delta_color == "inverse"):
+        color = ALERT_STYLE['NORMAL']['color']
+    else:
+        color = ALERT_STYLE['CRITICAL']['color']
+    delta_html = KPI_DELTA_HTML.format(
+        color=color, arrow='▼' if is_down else '▲', delta=delta
+    )
+    return KPI_HTML.format(label=label, value=value, delta_html=delta_html)
+
 # ============================================================================
 # LOAD DATA
 # ============================================================================
+# In-memory only: Streamlit ignores ttl on persist="disk" caches, which would
+# stop the 5-minute refresh and serve a stale payload across restarts
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def load_all_data():
     """Load all data from Supabase"""
     hospital_data = fetch_hospital_data()
     city_data = fetch_city_summary()
-    hospital_names = get_all_hospital_names()
-    return hospital_data, city_data, hospital_names
-
-# Load data
-hospital_data, city_data, hospital_names = load_all_data()
-
-# ============================================================================
-# HELPER FUNCTIONS
-# ============================================================================
-def get_alert_color(alert_level):
-    """Get color for alert level"""
-    alert_upper = str(alert_level).upper() if alert_level else 'NORMAL'
-    if alert_upper == 'CRITICAL':
-        return '#DC2626'
-    elif alert_upper == 'WATCH':
-        return '#F97316'
+    hospital_df = pd.DataFrame(hospital_data or [])
+    if not hospital_df.empty:
+        # Precompute display values once per refresh instead of on every rerun
+        hospital_df['icu_pct'] = pd.to_numeric(hospital_df['current_icu_occupancy'], errors='coerce') * 100
+        hospital_df['peak_pct'] = pd.to_numeric(hospital_df['predicted_week_4'], errors='coerce') * 100
+        hospital_df['delta_pct'] = pd.to_numeric(hospital_df['delta_week4'], errors='coerce') * 100
+        hospital_df['oxygen_days'] = pd.to_numeric(hospital_df['oxygen_weeks_remaining'], errors='coerce') * 7
+        alert = hospital_df['final_alert_level']
+        hospital_df['alert_upper'] = (
+            alert.where(alert.notna() & (alert != ''), 'NORMAL').astype(str).str.upper()
+        )
+        # Transfer candidates with spare capacity, least occupied first
+        receivers_df = hospital_df[hospital_df['current_icu_occupancy'] < 0.70].sort_values(
+            'current_icu_occupancy', kind='stable'
+        )
+        hospital_data = hospital_df.to_dict('records')
+        receivers = receivers_df.to_dict('records')
     else:
-        return '#10B981'
+        hospital_data, receivers = [], []
+    # Index rows by name so the selector lookup doesn't hit the database again
+    hospital_by_name = {h['hospital_name']: h for h in hospital_data}
+    hospital_names = sorted(hospital_by_name)
+    # Stable for the lifetime of this cache entry (id() of the payload is not,
+    # since cache_data hands back a fresh copy on every call)
+    data_version = time.time()
+    return hospital_data, city_data, hospital_names, hospital_by_name, receivers, data_version
 
-def get_alert_emoji(alert_level):
-    """Get emoji for alert level"""
-    alert_upper = str(alert_level).upper() if alert_level else 'NORMAL'
-    if alert_upper == 'CRITICAL':
-        return '🔴'
-    elif alert_upper == 'WATCH':
-        return '🟡'
-    else:
-        return '🟢'
+# Load data (spinner only shows while the cache is cold)
+with st.spinner('🏥 Initializing CodeBlue...'):
+    hospital_data, city_data, hospital_names, hospital_by_name, receivers, data_version = load_all_data()
 
 # ============================================================================
-# HEADER WITH LOGO
+# STATIC CONTENT
 # ============================================================================
-st.markdown("""
+HEADER_HTML = """
 <div style="display: flex; align-items: center; gap: 20px; margin-bottom: 20px;">
     <div style="background: linear-gradient(135deg, #06B6D4 0%, #0284C7 100%); 
                 padding: 15px 25px; 
@@ -93,19 +168,114 @@ st.markdown("""
         </p>
     </div>
 </div>
-""", unsafe_allow_html=True)
+"""
 
-st.markdown("---")
+ADVISORY_MSGS = {
+    'CRITICAL': """
+    **⚠️ CRITICAL ADVISORY**
+    
+    Healthcare demand in the Boston area is currently **critical** and showing significant strain.
+    
+    **What this means:**
+    - Hospital capacity is severely constrained
+    - Emergency rooms may have extended wait times
+    - Some non-urgent procedures may be delayed
+    
+    **Recommended actions:**
+    - Use **telehealth services** for all non-urgent consultations
+    - Visit **urgent care centers** instead of ERs for minor issues
+    - Postpone **non-urgent appointments** if possible
+    - Keep adequate emergency supplies at home
+    
+    **When to seek emergency care:**
+    - Severe chest pain or difficulty breathing
+    - Uncontrolled bleeding
+    - Sudden severe pain
+    - Signs of stroke or heart attack
+""",
+    'WATCH': """
+    **⚠️ ADVISORY NOTICE**
+    
+    Healthcare demand in the Boston area is currently **elevated** and showing an upward trend.
+    
+    **What this means:**
+    - Hospital capacity is being monitored closely
+    - Some facilities may experience longer wait times
+    - Healthcare system is functioning but under increased strain
+    
+    **Recommended actions:**
+    - Use **telehealth services** for non-urgent medical consultations
+    - Consider **urgent care centers** instead of emergency rooms for minor issues
+    - Schedule **routine appointments** in advance when possible
+    - Keep emergency supplies and medications stocked
+    
+    **When to seek emergency care:**
+    - Severe chest pain or difficulty breathing
+    - Uncontrolled bleeding
+    - Sudden severe pain
+    - Signs of stroke or heart attack
+""",
+    'NORMAL': """
+    **ℹ️ SYSTEM STATUS**
+    
+    Healthcare demand in the Boston area is currently **normal** with adequate capacity.
+    
+    **What this means:**
+    - Hospital systems are operating within normal parameters
+    - Standard wait times at emergency facilities
+    - All services functioning normally
+    
+    **General guidance:**
+    - Continue routine healthcare as scheduled
+    - Telehealth available for convenience
+    - Emergency services ready if needed
+""",
+}
+
+ADVISORY_RENDERERS = {
+    'CRITICAL': st.error,
+    'WATCH': st.warning,
+    'NORMAL': st.info,
+}
+
+CARE_CARD_HTML = """
+<div style="background: rgba({rgb}, 0.1); padding: 20px; border-radius: 10px; border: 2px solid rgba({rgb}, 0.3); text-align: center;">
+    <div style="font-size: 3rem; margin-bottom: 10px;">{emoji}</div>
+    <h4 style="color: {hex_color} !important; margin-bottom: 10px;">{title}</h4>
+    <p style="color: #CBD5E1 !important; font-size: 0.9rem;">{desc}</p>
+</div>
+"""
+
+# (rgb, color, emoji, title, description, button label, button key, info message)
+CARE_CARD_SPECS = (
+    ('6, 182, 212', '#06B6D4', '💻', 'Telehealth Portal', 'Connect with healthcare providers online',
+     '🔗 Visit Portal', 'telehealth_btn', '🔗 Telehealth Portal: https://telehealth.example.com'),
+    ('16, 185, 129', '#10B981', '🏥', 'Find Urgent Care', 'Locate nearby urgent care centers',
+     '📍 Locate Nearby', 'urgent_care_btn', '📍 Find Urgent Care: https://urgentcare.boston.gov'),
+    ('249, 115, 22', '#F97316', '⏱️', 'Hospital Wait Times', 'Check current wait times at ERs',
+     '🔍 Check Status', 'wait_times_btn', '🔍 Wait Times: https://waittimes.boston.gov'),
+)
+
+# Card HTML is rendered once at import: (html, button label, button key, info message)
+CARE_CARDS = tuple(
+    (CARE_CARD_HTML.format(rgb=rgb, hex_color=hex_color, emoji=emoji, title=title, desc=desc),
+     btn_label, btn_key, info_msg)
+    for rgb, hex_color, emoji, title, desc, btn_label, btn_key, info_msg in CARE_CARD_SPECS
+)
 
 # ============================================================================
-# TABS NAVIGATION
+# HEADER WITH LOGO
 # ============================================================================
-tab1, tab2 = st.tabs(["🏥 Operator Dashboard", "👥 Public Portal"])
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
+
+st.markdown("---")
 
 # ============================================================================
 # TAB 1: OPERATOR DASHBOARD
 # ============================================================================
-with tab1:
+@st.fragment
+def operator_dashboard(hospital_by_name, hospital_names, receivers, data_version):
+    """Operator tab; widget interactions rerun only this fragment"""
     st.title("🏥 CodeBlue Operator Dashboard")
     st.markdown("Real-time hospital strain monitoring and resource allocation")
     
@@ -129,11 +299,11 @@ with tab1:
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("🔄 Refresh Data", use_container_width=True, key="refresh_btn"):
             st.cache_data.clear()
-            st.rerun()
+            st.rerun(scope="app")  # reload data for the whole page, not just this fragment
     
     # Get selected hospital data
     if selected_hospital:
-        current_hospital = get_hospital_by_name(selected_hospital)
+        current_hospital = hospital_by_name.get(selected_hospital)
     else:
         current_hospital = None
     
@@ -143,39 +313,23 @@ with tab1:
         # ALERT BANNER with color-coded background
         alert_level = current_hospital['final_alert_level']
         
-        # Normalize alert level to uppercase for comparison (handles case sensitivity)
-        alert_level_upper = str(alert_level).upper() if alert_level else 'NORMAL'
+        # Normalized to uppercase in load_all_data (handles case sensitivity)
+        alert_level_upper = current_hospital['alert_upper']
+        oxygen_critical = str(current_hospital['oxygen_alert_level']).upper() == 'CRITICAL'
         
-        # Define colors and emojis based on alert level
-        if alert_level_upper == 'CRITICAL':
-            alert_color = '#DC2626'
-            alert_bg = 'linear-gradient(135deg, #DC2626 0%, #991B1B 100%)'
-            alert_emoji = '🔴'
-            alert_border = '#FEE2E2'
-            alert_shadow = 'rgba(220, 38, 38, 0.5)'
-        elif alert_level_upper == 'WATCH':
-            alert_color = '#F97316'
-            alert_bg = 'linear-gradient(135deg, #F97316 0%, #EA580C 100%)'
-            alert_emoji = '🟡'
-            alert_border = '#FED7AA'
-            alert_shadow = 'rgba(249, 115, 22, 0.5)'
-        else:  # NORMAL or any other value
-            alert_color = '#10B981'
-            alert_bg = 'linear-gradient(135deg, #10B981 0%, #059669 100%)'
-            alert_emoji = '🟢'
-            alert_border = '#D1FAE5'
-            alert_shadow = 'rgba(16, 185, 129, 0.5)'
+        # Colors and emojis based on alert level
+        alert_style = get_alert_style(alert_level_upper)
         
-        # Display values (convert to percentages)
-        projected_peak_display = current_hospital['predicted_week_4'] * 100
+        # Display values (precomputed percentages)
+        projected_peak_display = current_hospital['peak_pct']
         oxygen_weeks_display = current_hospital['oxygen_weeks_remaining']
         
         st.markdown(f"""
-        <div style="background: {alert_bg};
-                    border-radius: 12px; padding: 24px; border-left: 6px solid {alert_border};
-                    box-shadow: 0 8px 30px {alert_shadow}; margin: 20px 0;">
+        <div style="background: {alert_style['bg']};
+                    border-radius: 12px; padding: 24px; border-left: 6px solid {alert_style['border']};
+                    box-shadow: 0 8px 30px {alert_style['shadow']}; margin: 20px 0;">
             <div style="display: flex; align-items: center; gap: 12px;">
-                <span style="font-size: 2.5rem;">{alert_emoji}</span>
+                <span style="font-size: 2.5rem;">{alert_style['emoji']}</span>
                 <div>
                     <h3 style="margin: 0; font-size: 1.3rem; color: white !important;">{alert_level} STATUS</h3>
                     <p style="margin: 4px 0 0 0; color: #FEE2E2 !important;">
@@ -192,86 +346,70 @@ with tab1:
         # KEY METRICS ROW
         st.markdown("### 📊 Key Metrics")
         
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            current_icu = current_hospital['current_icu_occupancy'] * 100  # Convert to percentage
-            delta_val = current_hospital['delta_week4'] * 100  # Convert to percentage
-            st.metric(
-                label="Current ICU Occupancy",
-                value=f"{current_icu:.1f}%",  # 1 decimal place
-                delta=f"{delta_val:+.1f}%",
-                delta_color="inverse"
-            )
-        
-        with col2:
-            projected_peak = current_hospital['predicted_week_4'] * 100  # Convert to percentage
-            st.metric(
-                label="Projected Peak (4 weeks)",
-                value=f"{projected_peak:.1f}%",  # 1 decimal place
-                delta="Week 4",
-                delta_color="off"
-            )
-        
-        with col3:
-            oxygen_weeks = current_hospital['oxygen_weeks_remaining']
-            oxygen_days = oxygen_weeks * 7
-            st.metric(
-                label="Oxygen Supply",
-                value=f"{oxygen_days:.0f} days",  # No decimals for days
-                delta=current_hospital['oxygen_alert_level'],
-                delta_color="inverse" if str(current_hospital['oxygen_alert_level']).upper() == 'CRITICAL' else "normal"
-            )
-        
-        with col4:
-            strain_index = current_icu  # Already converted to percentage
-            st.metric(
-                label="Strain Index",
-                value=f"{strain_index:.1f}/100",  # 1 decimal place
-                delta=alert_level,
-                delta_color="inverse" if alert_level_upper != 'NORMAL' else "normal"
-            )
+        current_icu = current_hospital['icu_pct']
+        strain_index = current_icu  # Already converted to percentage
+        
+        # One HTML block instead of four st.metric widgets
+        metrics_html = (
+            '<div class="kpi-row">'
+            + kpi_html("Current ICU Occupancy", f"{current_icu:.1f}%",
+                       f"{current_hospital['delta_pct']:+.1f}%", "inverse")
+            + kpi_html("Projected Peak (4 weeks)", f"{projected_peak_display:.1f}%",
+                       "Week 4", "off")
+            + kpi_html("Oxygen Supply", f"{current_hospital['oxygen_days']:.0f} days",
+                       current_hospital['oxygen_alert_level'],
+                       "inverse" if oxygen_critical else "normal")
+            + kpi_html("Strain Index", f"{strain_index:.1f}/100",
+                       alert_level,
+                       "inverse" if alert_level_upper != 'NORMAL' else "normal")
+            + '</div>'
+        )
+        st.markdown(metrics_html, unsafe_allow_html=True)
 
         st.markdown("---")
         
         # CHARTS SECTION - STACKED VERTICALLY (FULL WIDTH)
         st.markdown("### 📈 Predictive Analytics")
         
+        # Reuse this session's figures until the hospital or data refresh changes
+        figs_key = (selected_hospital, data_version)
+        if st.session_state.get('last_figs_key') != figs_key:
+            st.session_state.figs = (
+                create_icu_forecast_chart(current_hospital),
+                create_oxygen_depletion_chart(current_hospital)
+            )
+            st.session_state.last_figs_key = figs_key
+        fig_icu, fig_oxygen = st.session_state.figs
+        
         # ICU Capacity Forecast - FULL WIDTH
         st.markdown("#### ICU Capacity Forecast")
-        from components.charts import create_icu_forecast_chart
-        fig_icu = create_icu_forecast_chart(current_hospital)
         st.plotly_chart(fig_icu, use_container_width=True, config={'displayModeBar': False})
         
         st.markdown("<br>", unsafe_allow_html=True)
         
         # Oxygen Depletion Timeline - FULL WIDTH
         st.markdown("#### Oxygen Depletion Timeline")
-        from components.charts import create_oxygen_depletion_chart
-        fig_oxygen = create_oxygen_depletion_chart(current_hospital)
         st.plotly_chart(fig_oxygen, use_container_width=True, config={'displayModeBar': False})
 
         st.markdown("---")
         
         # RECOMMENDATIONS SECTION (if critical)
-        if alert_level_upper == 'CRITICAL' and hospital_data:
+        if alert_level_upper == 'CRITICAL':
             st.markdown("### 💡 Recommended Actions")
             
-            # Find hospital with capacity
-            receiving_hospital = None
-            for h in hospital_data:
-                if h['hospital_name'] != selected_hospital and h['current_icu_occupancy'] < 0.70:
-                    receiving_hospital = h
-                    break
+            # Find the least occupied hospital with capacity
+            receiving_hospital = next(
+                (h for h in receivers if h['hospital_name'] != selected_hospital), None
+            )
             
             if receiving_hospital:
                 # Calculate transfer counts
                 current_capacity = current_hospital['current_icu_capacity']
                 transfer_count = int((current_hospital['predicted_week_4'] - 0.75) * current_capacity)
-                post_transfer = (current_hospital['predicted_week_4'] * 100) - (transfer_count / current_capacity * 100)
-                impact = (current_hospital['predicted_week_4'] * 100) - post_transfer
+                post_transfer = projected_peak_display - (transfer_count / current_capacity * 100)
+                impact = projected_peak_display - post_transfer
                 
-                receiving_occupancy = receiving_hospital['current_icu_occupancy'] * 100
+                receiving_occupancy = receiving_hospital['icu_pct']
                 
                 st.markdown(f"""
                 <div class="recommendation-card">
@@ -325,7 +463,9 @@ with tab1:
 # ============================================================================
 # TAB 2: PUBLIC PORTAL
 # ============================================================================
-with tab2:
+@st.fragment
+def public_portal(city_data):
+    """Public tab; widget interactions rerun only this fragment"""
     st.title("👥 Boston Healthcare System Status")
     st.markdown("Public health information and guidance")
     
@@ -344,18 +484,17 @@ with tab2:
             trend = city_data['trend_direction']
             
             # Normalize alert level
-            alert_level_upper = str(alert_level).upper() if alert_level else 'NORMAL'
+            alert_level_upper = normalize_alert_level(alert_level)
             
             # Determine color
             if alert_level_upper == 'CRITICAL' or city_icu > 85:
-                color = '#DC2626'
-                level_text = 'Critical'
+                city_style = ALERT_STYLE['CRITICAL']
             elif alert_level_upper == 'WATCH' or city_icu > 70:
-                color = '#F97316'
-                level_text = 'Elevated'
+                city_style = ALERT_STYLE['WATCH']
             else:
-                color = '#10B981'
-                level_text = 'Normal'
+                city_style = ALERT_STYLE['NORMAL']
+            color = city_style['color']
+            level_text = city_style['label']
             
             trend_emoji = '📈' if trend == 'RISING' else '📉' if trend == 'FALLING' else '➡️'
             
@@ -380,71 +519,8 @@ with tab2:
         st.markdown("---")
         
         # ADVISORY MESSAGE
-        if alert_level_upper == 'CRITICAL':
-            advisory_msg = """
-            **⚠️ CRITICAL ADVISORY**
-            
-            Healthcare demand in the Boston area is currently **critical** and showing significant strain.
-            
-            **What this means:**
-            - Hospital capacity is severely constrained
-            - Emergency rooms may have extended wait times
-            - Some non-urgent procedures may be delayed
-            
-            **Recommended actions:**
-            - Use **telehealth services** for all non-urgent consultations
-            - Visit **urgent care centers** instead of ERs for minor issues
-            - Postpone **non-urgent appointments** if possible
-            - Keep adequate emergency supplies at home
-            
-            **When to seek emergency care:**
-            - Severe chest pain or difficulty breathing
-            - Uncontrolled bleeding
-            - Sudden severe pain
-            - Signs of stroke or heart attack
-            """
-            st.error(advisory_msg)
-        elif alert_level_upper == 'WATCH':
-            advisory_msg = """
-            **⚠️ ADVISORY NOTICE**
-            
-            Healthcare demand in the Boston area is currently **elevated** and showing an upward trend.
-            
-            **What this means:**
-            - Hospital capacity is being monitored closely
-            - Some facilities may experience longer wait times
-            - Healthcare system is functioning but under increased strain
-            
-            **Recommended actions:**
-            - Use **telehealth services** for non-urgent medical consultations
-            - Consider **urgent care centers** instead of emergency rooms for minor issues
-            - Schedule **routine appointments** in advance when possible
-            - Keep emergency supplies and medications stocked
-            
-            **When to seek emergency care:**
-            - Severe chest pain or difficulty breathing
-            - Uncontrolled bleeding
-            - Sudden severe pain
-            - Signs of stroke or heart attack
-            """
-            st.warning(advisory_msg)
-        else:
-            advisory_msg = """
-            **ℹ️ SYSTEM STATUS**
-            
-            Healthcare demand in the Boston area is currently **normal** with adequate capacity.
-            
-            **What this means:**
-            - Hospital systems are operating within normal parameters
-            - Standard wait times at emergency facilities
-            - All services functioning normally
-            
-            **General guidance:**
-            - Continue routine healthcare as scheduled
-            - Telehealth available for convenience
-            - Emergency services ready if needed
-            """
-            st.info(advisory_msg)
+        advisory_key = alert_level_upper if alert_level_upper in ADVISORY_MSGS else 'NORMAL'
+        ADVISORY_RENDERERS[advisory_key](ADVISORY_MSGS[advisory_key])
         
         st.markdown("---")
         
@@ -490,43 +566,12 @@ with tab2:
     # NON-EMERGENCY CARE
     st.markdown("### 🏥 Non-Emergency Care")
     
-    care_col1, care_col2, care_col3 = st.columns(3)
-    
-    with care_col1:
-        st.markdown("""
-        <div style="background: rgba(6, 182, 212, 0.1); padding: 20px; border-radius: 10px; border: 2px solid rgba(6, 182, 212, 0.3); text-align: center;">
-            <div style="font-size: 3rem; margin-bottom: 10px;">💻</div>
-            <h4 style="color: #06B6D4 !important; margin-bottom: 10px;">Telehealth Portal</h4>
-            <p style="color: #CBD5E1 !important; font-size: 0.9rem;">Connect with healthcare providers online</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("🔗 Visit Portal", use_container_width=True, key="telehealth_btn"):
-            st.info("🔗 Telehealth Portal: https://telehealth.example.com")
-    
-    with care_col2:
-        st.markdown("""
-        <div style="background: rgba(16, 185, 129, 0.1); padding: 20px; border-radius: 10px; border: 2px solid rgba(16, 185, 129, 0.3); text-align: center;">
-            <div style="font-size: 3rem; margin-bottom: 10px;">🏥</div>
-            <h4 style="color: #10B981 !important; margin-bottom: 10px;">Find Urgent Care</h4>
-            <p style="color: #CBD5E1 !important; font-size: 0.9rem;">Locate nearby urgent care centers</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("📍 Locate Nearby", use_container_width=True, key="urgent_care_btn"):
-            st.info("📍 Find Urgent Care: https://urgentcare.boston.gov")
-    
-    with care_col3:
-        st.markdown("""
-        <div style="background: rgba(249, 115, 22, 0.1); padding: 20px; border-radius: 10px; border: 2px solid rgba(249, 115, 22, 0.3); text-align: center;">
-            <div style="font-size: 3rem; margin-bottom: 10px;">⏱️</div>
-            <h4 style="color: #F97316 !important; margin-bottom: 10px;">Hospital Wait Times</h4>
-            <p style="color: #CBD5E1 !important; font-size: 0.9rem;">Check current wait times at ERs</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if st.button("🔍 Check Status", use_container_width=True, key="wait_times_btn"):
-            st.info("🔍 Wait Times: https://waittimes.boston.gov")
+    for care_col, (card_html, btn_label, btn_key, info_msg) in zip(st.columns(3), CARE_CARDS):
+        with care_col:
+            st.markdown(card_html, unsafe_allow_html=True)
+            
+            if st.button(btn_label, use_container_width=True, key=btn_key):
+                st.info(info_msg)
     
     st.markdown("---")
     
@@ -552,6 +597,17 @@ with tab2:
             - **BMC Info:** (617) 638-8000
             """)
 
+# ============================================================================
+# TABS NAVIGATION
+# ============================================================================
+tab1, tab2 = st.tabs(["🏥 Operator Dashboard", "👥 Public Portal"])
+
+with tab1:
+    operator_dashboard(hospital_by_name, hospital_names, receivers, data_version)
+
+with tab2:
+    public_portal(city_data)
+
 # ============================================================================
 # FOOTER
 # ============================================================================
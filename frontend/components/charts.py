@@ -1,8 +1,57 @@
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
+import streamlit as st
 from datetime import datetime, timedelta
 
+# Shared Plotly styling, built once at import
+BASE_LAYOUT = dict(
+    height=550,  # Taller chart
+    template='plotly_dark',
+    paper_bgcolor='rgba(15, 23, 42, 0.5)',
+    plot_bgcolor='rgba(15, 23, 42, 0.8)'
+)
+
+LEGEND_STYLE = dict(
+    orientation="h",
+    yanchor="bottom",
+    y=1.02,
+    xanchor="right",
+    x=1,
+    bgcolor='rgba(15, 23, 42, 0.9)',
+    bordercolor='rgba(6, 182, 212, 0.5)',
+    borderwidth=3,
+    font=dict(size=16, color='#E2E8F0', family="Arial Black")
+)
+
+AXIS_STYLE = dict(
+    showgrid=True,
+    gridwidth=1.5,
+    gridcolor='rgba(148, 163, 184, 0.3)',
+    title_font=dict(color='#F1F5F9', size=16, family="Arial Black"),
+    tickfont=dict(size=13, color='#CBD5E1')
+)
+
+CHART_LAYOUT = dict(
+    BASE_LAYOUT,
+    hovermode='x unified',
+    showlegend=True,
+    legend=LEGEND_STYLE,
+    xaxis=dict(AXIS_STYLE, title='Date'),
+    font=dict(color='#E2E8F0'),
+    margin=dict(l=70, r=70, t=50, b=70)
+)
+
+ICU_YAXIS = dict(AXIS_STYLE, title='ICU Occupancy (%)')
+OXY_YAXIS = dict(AXIS_STYLE, title='Days of Supply Remaining')
+
+THRESHOLD_FONT = dict(size=14, family="Arial Black")
+
+# Synthetic 4-week history leading into the current value
+HIST_FLOORS = np.array([50, 55, 60, 65, 0], dtype=np.float64)
+HIST_OFFSETS = np.array([20, 15, 10, 5, 0], dtype=np.float64)
+
+@st.cache_data(ttl=300, max_entries=64)  # Keyed on the hospital row contents
 def create_icu_forecast_chart(hospital_data):
     """Beautiful ICU capacity forecast chart using real data - FULL WIDTH"""
     
@@ -14,28 +63,23 @@ def create_icu_forecast_chart(hospital_data):
     dates_forecast = pd.date_range(start=today, periods=5, freq='W')
     
     # Extract forecast data and convert to percentages
-    current = hospital_data['current_icu_occupancy'] * 100
-    week1 = hospital_data['predicted_week_1'] * 100
-    week2 = hospital_data['predicted_week_2'] * 100
-    week3 = hospital_data['predicted_week_3'] * 100
-    week4 = hospital_data['predicted_week_4'] * 100
+    # (float() first: NUMERIC columns arrive as Decimal, which NumPy floats reject)
+    current = float(hospital_data['current_icu_occupancy']) * 100
+    week1 = float(hospital_data['predicted_week_1']) * 100
+    week2 = float(hospital_data['predicted_week_2']) * 100
+    week3 = float(hospital_data['predicted_week_3']) * 100
+    week4 = float(hospital_data['predicted_week_4']) * 100
     
     forecast_values = [current, week1, week2, week3, week4]
     
     # Create historical pattern (last 4 weeks leading to current)
     dates_hist = pd.date_range(end=today, periods=5, freq='W')
-    hist_values = [
-        max(50, current - 20),
-        max(55, current - 15),
-        max(60, current - 10),
-        max(65, current - 5),
-        current
-    ]
+    hist_values = np.maximum(HIST_FLOORS, current - HIST_OFFSETS).tolist()
     
     fig = go.Figure()
     
     # Historical data - Cyan line
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates_hist,
         y=hist_values,
         mode='lines+markers',
@@ -46,7 +90,7 @@ def create_icu_forecast_chart(hospital_data):
     ))
     
     # Forecast data - BRIGHT PURPLE dashed line
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates_forecast,
         y=forecast_values,
         mode='lines+markers',
@@ -64,7 +108,7 @@ def create_icu_forecast_chart(hospital_data):
         line_width=3,
         annotation_text="Critical (90%)",
         annotation_position="right",
-        annotation_font=dict(color="#DC2626", size=14, family="Arial Black")
+        annotation_font=dict(THRESHOLD_FONT, color="#DC2626")
     )
     
     fig.add_hline(
@@ -74,59 +118,26 @@ def create_icu_forecast_chart(hospital_data):
         line_width=3,
         annotation_text="Watch (75%)",
         annotation_position="right",
-        annotation_font=dict(color="#F97316", size=14, family="Arial Black")
+        annotation_font=dict(THRESHOLD_FONT, color="#F97316")
     )
     
     # Styling
     fig.update_layout(
-        height=550,  # Taller chart
-        template='plotly_dark',
-        paper_bgcolor='rgba(15, 23, 42, 0.5)',
-        plot_bgcolor='rgba(15, 23, 42, 0.8)',
-        hovermode='x unified',
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            bgcolor='rgba(15, 23, 42, 0.9)',
-            bordercolor='rgba(6, 182, 212, 0.5)',
-            borderwidth=3,
-            font=dict(size=16, color='#E2E8F0', family="Arial Black")
-        ),
-        xaxis=dict(
-            showgrid=True,
-            gridwidth=1.5,
-            gridcolor='rgba(148, 163, 184, 0.3)',
-            title='Date',
-            title_font=dict(color='#F1F5F9', size=16, family="Arial Black"),
-            tickfont=dict(size=13, color='#CBD5E1')
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridwidth=1.5,
-            gridcolor='rgba(148, 163, 184, 0.3)',
-            title='ICU Occupancy (%)',
-            title_font=dict(color='#F1F5F9', size=16, family="Arial Black"),
-            tickfont=dict(size=13, color='#CBD5E1'),
-            range=[max(0, min(hist_values) - 10), 100]
-        ),
-        font=dict(color='#E2E8F0'),
-        margin=dict(l=70, r=70, t=50, b=70)
+        **CHART_LAYOUT,
+        yaxis=dict(ICU_YAXIS, range=[max(0, min(hist_values) - 10), 100])
     )
     
     return fig
 
 
+@st.cache_data(ttl=300, max_entries=64)  # Keyed on the hospital row contents
 def create_oxygen_depletion_chart(hospital_data):
     """Beautiful oxygen depletion timeline using real data - FULL WIDTH"""
     
     if not hospital_data:
         return create_demo_oxygen_chart()
     
-    oxygen_weeks = hospital_data['oxygen_weeks_remaining']
+    oxygen_weeks = float(hospital_data['oxygen_weeks_remaining'])
     
     # Generate dates (convert weeks to days)
     days = int(oxygen_weeks * 7)
@@ -138,7 +149,7 @@ def create_oxygen_depletion_chart(hospital_data):
     fig = go.Figure()
     
     # Oxygen supply curve - Bright Green
-    fig.add_trace(go.Scatter(
+    fig.add_trace(go.Scattergl(
         x=dates,
         y=oxygen_supply,
         fill='tozeroy',
@@ -157,47 +168,13 @@ def create_oxygen_depletion_chart(hospital_data):
         line_width=3,
         annotation_text="Critical (7 days)",
         annotation_position="right",
-        annotation_font=dict(color="#DC2626", size=14, family="Arial Black")
+        annotation_font=dict(THRESHOLD_FONT, color="#DC2626")
     )
     
     # Styling
     fig.update_layout(
-        height=550,  # Taller chart
-        template='plotly_dark',
-        paper_bgcolor='rgba(15, 23, 42, 0.5)',
-        plot_bgcolor='rgba(15, 23, 42, 0.8)',
-        hovermode='x unified',
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            bgcolor='rgba(15, 23, 42, 0.9)',
-            bordercolor='rgba(6, 182, 212, 0.5)',
-            borderwidth=3,
-            font=dict(size=16, color='#E2E8F0', family="Arial Black")
-        ),
-        xaxis=dict(
-            showgrid=True,
-            gridwidth=1.5,
-            gridcolor='rgba(148, 163, 184, 0.3)',
-            title='Date',
-            title_font=dict(color='#F1F5F9', size=16, family="Arial Black"),
-            tickfont=dict(size=13, color='#CBD5E1')
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridwidth=1.5,
-            gridcolor='rgba(148, 163, 184, 0.3)',
-            title='Days of Supply Remaining',
-            title_font=dict(color='#F1F5F9', size=16, family="Arial Black"),
-            tickfont=dict(size=13, color='#CBD5E1'),
-            range=[0, max(days + 5, 15)]
-        ),
-        font=dict(color='#E2E8F0'),
-        margin=dict(l=70, r=70, t=50, b=70)
+        **CHART_LAYOUT,
+        yaxis=dict(OXY_YAXIS, range=[0, max(days + 5, 15)])
     )
     
     return fig
@@ -213,14 +190,12 @@ def create_demo_icu_chart():
     icu_forecast = [88, 89, 89, 90, 90, 91, 91, 92, 92, 91, 92, 91, 90, 89]
     
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates_hist, y=icu_hist, mode='lines+markers', name='Historical',
-                             line=dict(color='#06B6D4', width=5), marker=dict(size=10)))
-    fig.add_trace(go.Scatter(x=dates_forecast, y=icu_forecast, mode='lines+markers', name='Forecast',
-                             line=dict(color='#E879F9', width=6, dash='dash'), 
-                             marker=dict(size=12, symbol='diamond')))
-    fig.update_layout(height=550, template='plotly_dark', 
-                     paper_bgcolor='rgba(15, 23, 42, 0.5)',
-                     plot_bgcolor='rgba(15, 23, 42, 0.8)')
+    fig.add_trace(go.Scattergl(x=dates_hist, y=icu_hist, mode='lines+markers', name='Historical',
+                               line=dict(color='#06B6D4', width=5), marker=dict(size=10)))
+    fig.add_trace(go.Scattergl(x=dates_forecast, y=icu_forecast, mode='lines+markers', name='Forecast',
+                               line=dict(color='#E879F9', width=6, dash='dash'), 
+                               marker=dict(size=12, symbol='diamond')))
+    fig.update_layout(**BASE_LAYOUT)
     return fig
 
 
@@ -230,10 +205,8 @@ def create_demo_oxygen_chart():
     oxygen_days = list(range(14, 0, -1))
     
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dates, y=oxygen_days, fill='tozeroy', mode='lines',
-                             name='Oxygen Supply', line=dict(color='#10B981', width=5),
-                             fillcolor='rgba(16, 185, 129, 0.4)'))
-    fig.update_layout(height=550, template='plotly_dark',
-                     paper_bgcolor='rgba(15, 23, 42, 0.5)',
-                     plot_bgcolor='rgba(15, 23, 42, 0.8)')
+    fig.add_trace(go.Scattergl(x=dates, y=oxygen_days, fill='tozeroy', mode='lines',
+                               name='Oxygen Supply', line=dict(color='#10B981', width=5),
+                               fillcolor='rgba(16, 185, 129, 0.4)'))
+    fig.update_layout(**BASE_LAYOUT)
     return fig
\ No newline at end of file
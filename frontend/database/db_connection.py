@@ -1,6 +1,7 @@
 import os
-import psycopg2
+from contextlib import contextmanager
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 import streamlit as st
 
@@ -8,81 +9,69 @@ import streamlit as st
 load_dotenv()
 
 @st.cache_resource
-def get_db_connection():
-    """Create and cache database connection"""
+def get_pool():
+    """Create and cache a thread-safe connection pool shared by all sessions"""
+    return ThreadedConnectionPool(
+        1,
+        10,
+        os.getenv('DATABASE_URL'),
+        cursor_factory=RealDictCursor,
+        # TCP keepalives stop idle-timeout drops of long-lived connections
+        keepalives=1,
+        keepalives_idle=30,
+        keepalives_interval=10,
+        keepalives_count=5
+    )
+
+@contextmanager
+def get_connection():
+    """Borrow a pooled connection (None if the database is unreachable)"""
     try:
-        conn = psycopg2.connect(
-            os.getenv('DATABASE_URL'),
-            cursor_factory=RealDictCursor
-        )
-        return conn
+        pool = get_pool()
+        conn = pool.getconn()
     except Exception as e:
         st.error(f"Database connection failed: {e}")
-        return None
+        yield None
+        return
+
+    try:
+        if not conn.autocommit:
+            # Dashboard only reads; avoid leaving connections idle in transaction
+            conn.set_session(readonly=True, autocommit=True)
+        yield conn
+    finally:
+        # Discard connections that died so the pool opens a fresh one
+        pool.putconn(conn, close=bool(conn.closed))
 
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_hospital_data():
     """Fetch data from ma_dashboard_view"""
-    conn = get_db_connection()
-    if not conn:
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM ma_dashboard_view")
-        data = cursor.fetchall()
-        cursor.close()
-        return data
-    except Exception as e:
-        st.error(f"Error fetching hospital data: {e}")
-        return None
+    with get_connection() as conn:
+        if not conn:
+            return None
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT * FROM ma_dashboard_view")
+                data = cursor.fetchall()
+            # Plain dicts so the result can be cached and serialized
+            return [dict(row) for row in data]
+        except Exception as e:
+            st.error(f"Error fetching hospital data: {e}")
+            return None
 
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_city_summary():
     """Fetch data from ma_city_summary"""
-    conn = get_db_connection()
-    if not conn:
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM ma_city_summary")
-        data = cursor.fetchone()
-        cursor.close()
-        return data
-    except Exception as e:
-        st.error(f"Error fetching city summary: {e}")
-        return None
-
-def get_hospital_by_name(hospital_name):
-    """Get specific hospital data by name"""
-    conn = get_db_connection()
-    if not conn:
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM ma_dashboard_view WHERE hospital_name = %s",
-            (hospital_name,)
-        )
-        data = cursor.fetchone()
-        cursor.close()
-        return data
-    except Exception as e:
-        st.error(f"Error fetching hospital: {e}")
-        return None
+    with get_connection() as conn:
+        if not conn:
+            return None
 
-def get_all_hospital_names():
-    """Get list of all hospital names"""
-    conn = get_db_connection()
-    if not conn:
-        return []
-    
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT hospital_name FROM ma_dashboard_view ORDER BY hospital_name")
-        data = cursor.fetchall()
-        cursor.close()
-        return [row['hospital_name'] for row in data]
-    except Exception as e:
-        st.error(f"Error fetching hospital names: {e}")
-        return []
\ No newline at end of file
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT * FROM ma_city_summary")
+                data = cursor.fetchone()
+            return dict(data) if data else None
+        except Exception as e:
+            st.error(f"Error fetching city summary: {e}")
+            return None
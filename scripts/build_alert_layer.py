@@ -4,13 +4,30 @@ import numpy as np
 import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 INITIAL_OXYGEN = 40
 BURN_SCALE = 15
+MAX_OXYGEN_WEEKS = 52
+# Supply/burn ratios within this of a whole number count as that many weeks,
+# so exact 40/k burns give k weeks whichever way the division rounds
+WEEKS_EPSILON = 1e-9
+
+# Severity codes index into ALERT_LEVELS: 0=Normal, 1=Watch, 2=Critical
+ALERT_LEVELS = np.array(["Normal", "Watch", "Critical"])
+
+def oxygen_weeks_remaining(burn_rate):
+    # Weeks of supply at a constant weekly burn: ceil(INITIAL_OXYGEN / burn),
+    # capped at MAX_OXYGEN_WEEKS (a non-positive burn never runs out)
+    burn_rate = np.asarray(burn_rate, dtype=float)
+    with np.errstate(divide="ignore"):
+        weeks = np.ceil(INITIAL_OXYGEN / burn_rate - WEEKS_EPSILON)
+    return np.where(
+        burn_rate <= 0, MAX_OXYGEN_WEEKS, np.minimum(MAX_OXYGEN_WEEKS, weeks)
+    ).astype(int)
 
 def main():
     conn = psycopg2.connect(DATABASE_URL)
@@ -22,7 +39,8 @@ def main():
     # Pull latest clean data
     # ---------------------------
     df_clean = pd.read_sql(
-        "SELECT * FROM ma_hospital_daily_clean;", conn
+        "SELECT hospital_pk, date, icu_occupancy_rate FROM ma_hospital_daily_clean;",
+        conn
     )
 
     df_clean["icu_occupancy_rate"] = pd.to_numeric(
@@ -42,7 +60,11 @@ def main():
     # ---------------------------
     try:
         df_forecast = pd.read_sql(
-            "SELECT * FROM ma_hospital_forecast;", conn
+            """
+            SELECT hospital_pk, forecast_date, predicted_icu_occupancy
+            FROM ma_hospital_forecast;
+            """,
+            conn
         )
     except:
         df_forecast = pd.DataFrame()
@@ -64,84 +86,69 @@ def main():
     else:
         print("No forecast found. Using current occupancy.")
 
-    results = []
-
-    for _, row in df_latest.iterrows():
-
-        hospital_id = row["hospital_pk"]
-
-        # ---------------------------
-        # Determine occupancy (forecast or current)
-        # ---------------------------
-        if not df_forecast.empty and hospital_id in df_forecast["hospital_pk"].values:
-            forecast_row = df_forecast[
-                df_forecast["hospital_pk"] == hospital_id
-            ].iloc[0]
-
-            occupancy = float(forecast_row["predicted_icu_occupancy"])
-        else:
-            occupancy = float(row["icu_occupancy_rate"])
-
-        occupancy = max(0.0, min(occupancy, 1.5))
-
-        # ---------------------------
-        # ICU Alert
-        # ---------------------------
-        if occupancy >= 0.9:
-            icu_alert = "Critical"
-        elif occupancy >= 0.75:
-            icu_alert = "Watch"
-        else:
-            icu_alert = "Normal"
-
-        # ---------------------------
-        # Oxygen Simulation
-        # ---------------------------
-        burn_rate = occupancy * BURN_SCALE
-
-        if burn_rate <= 0:
-            weeks = 52
-        else:
-            oxygen = INITIAL_OXYGEN
-            weeks = 0
-            while oxygen > 0 and weeks < 52:
-                oxygen -= burn_rate
-                weeks += 1
-
-        days_remaining = weeks * 7
-
-        if weeks <= 3:
-            oxygen_alert = "Critical"
-        elif weeks <= 6:
-            oxygen_alert = "Watch"
-        else:
-            oxygen_alert = "Normal"
-
-        # ---------------------------
-        # Final Severity
-        # ---------------------------
-        severity_rank = {
-            "Normal": 0,
-            "Watch": 1,
-            "Critical": 2
-        }
-
-        final_alert = max(
-            icu_alert,
-            oxygen_alert,
-            key=lambda x: severity_rank[x]
+    # ---------------------------
+    # Determine occupancy (forecast or current)
+    # ---------------------------
+    df_alert = df_latest[["hospital_pk", "date", "icu_occupancy_rate"]]
+
+    if not df_forecast.empty:
+        df_alert = df_alert.merge(
+            df_forecast[["hospital_pk", "predicted_icu_occupancy"]],
+            how="left",
+            on="hospital_pk"
+        )
+        forecast = df_alert["predicted_icu_occupancy"]
+        occupancy = np.where(
+            forecast.notna(), forecast, df_alert["icu_occupancy_rate"]
         )
+    else:
+        occupancy = df_alert["icu_occupancy_rate"].to_numpy()
+
+    occupancy = np.clip(occupancy.astype(float), 0.0, 1.5)
+
+    # ---------------------------
+    # ICU Alert
+    # ---------------------------
+    icu_code = np.select(
+        [occupancy >= 0.9, occupancy >= 0.75],
+        [2, 1],
+        default=0
+    )
+
+    # ---------------------------
+    # Oxygen Simulation (closed form of the weekly burn-down)
+    # ---------------------------
+    weeks = oxygen_weeks_remaining(occupancy * BURN_SCALE)
+
+    days_remaining = weeks * 7
+
+    oxygen_code = np.select(
+        [weeks <= 3, weeks <= 6],
+        [2, 1],
+        default=0
+    )
+
+    # ---------------------------
+    # Final Severity
+    # ---------------------------
+    final_code = np.maximum(icu_code, oxygen_code)
+
+    icu_alert = np.take(ALERT_LEVELS, icu_code)
+    oxygen_alert = np.take(ALERT_LEVELS, oxygen_code)
+    final_alert = np.take(ALERT_LEVELS, final_code)
+
+    created_at = datetime.utcnow()
 
-        results.append((
-            hospital_id,
-            row["date"],
-            days_remaining,
-            weeks,
-            oxygen_alert,
-            icu_alert,
-            final_alert,
-            datetime.utcnow()
-        ))
+    results = list(zip(
+        df_alert["hospital_pk"].tolist(),
+        df_alert["date"].tolist(),
+        days_remaining.tolist(),
+        weeks.tolist(),
+        oxygen_alert.tolist(),
+        icu_alert.tolist(),
+        final_alert.tolist(),
+        [created_at] * len(df_alert)
+    ))
 
     # ---------------------------
     # Upsert results
@@ -157,7 +164,7 @@ def main():
         final_alert_level,
         created_at
     )
-    VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
+    VALUES %s
     ON CONFLICT (hospital_pk, date)
     DO UPDATE SET
         oxygen_days_remaining = EXCLUDED.oxygen_days_remaining,
@@ -168,7 +175,7 @@ def main():
         created_at = EXCLUDED.created_at;
     """
 
-    execute_batch(cursor, insert_query, results, page_size=1000)
+    execute_values(cursor, insert_query, results, page_size=1000)
     conn.commit()
 
     cursor.close()
@@ -1,3 +1,4 @@
+import io
 import os
 import pandas as pd
 import psycopg2
@@ -18,9 +19,87 @@ cursor = conn.cursor()
 print("Connected to DB for cleaning.")
 
 # ---------------------------
-# Pull raw data
+# Table columns (one catalog lookup for both tables)
 # ---------------------------
-df = pd.read_sql("SELECT * FROM raw_hhs_facility;", conn)
+cursor.execute("""
+    SELECT table_name, column_name, data_type
+    FROM information_schema.columns
+    WHERE table_name IN ('ma_hospital_daily_clean', 'raw_hhs_facility')
+    ORDER BY table_name, ordinal_position;
+""")
+
+table_columns = cursor.fetchall()
+
+clean_cols = [
+    col for table, col, _ in table_columns
+    if table == "ma_hospital_daily_clean"
+]
+raw_cols = [
+    col for table, col, _ in table_columns
+    if table == "raw_hhs_facility"
+]
+
+# Numeric columns as detected from the DB
+numeric_cols = [
+    col for table, col, dtype in table_columns
+    if table == "raw_hhs_facility" and dtype == "double precision"
+]
+
+# Raw columns needed for the date, the structural guards and the grouping
+REQUIRED_RAW_COLS = [
+    "hospital_pk",
+    "collection_week",
+    "total_icu_beds_7_day_avg",
+    "inpatient_beds_7_day_avg"
+]
+
+# ---------------------------
+# Pull raw data (only columns that can reach the clean table)
+# ---------------------------
+select_cols = [
+    c for c in raw_cols if c in clean_cols or c in REQUIRED_RAW_COLS
+]
+
+# Structural guards and the "last 120 weeks per hospital" cut run in
+# Postgres, so only rows that survive cleaning are transferred
+guards = ["hospital_pk IS NOT NULL", "collection_week IS NOT NULL"]
+for guard_col in ["total_icu_beds_7_day_avg", "inpatient_beds_7_day_avg"]:
+    if guard_col in raw_cols:
+        guards.append(f"{guard_col} > 0")
+
+col_sql = ",".join(select_cols)
+
+raw_query = f"""
+    SELECT {col_sql}
+    FROM (
+        SELECT {col_sql},
+               ROW_NUMBER() OVER (
+                   PARTITION BY hospital_pk
+                   ORDER BY collection_week DESC
+               ) AS week_rank
+        FROM raw_hhs_facility
+        WHERE {" AND ".join(guards)}
+    ) recent
+    WHERE week_rank <= 120
+"""
+
+# COPY streams the rows as CSV, which pandas parses in C; much faster
+# than pd.read_sql building a Python object per cell
+buf = io.StringIO()
+cursor.copy_expert(
+    f"COPY ({raw_query}) TO STDOUT WITH (FORMAT csv, HEADER)", buf
+)
+buf.seek(0)
+
+# Non-numeric columns stay text (keeps ids and zip codes intact).
+# Only COPY's unquoted empty field is NULL; literal "NA"/"None"/... stay text
+df = pd.read_csv(
+    buf,
+    dtype={c: str for c in select_cols if c not in numeric_cols},
+    keep_default_na=False,
+    na_values=[""],
+    low_memory=False
+)
 
 # ---------------------------
 # Convert date
@@ -28,18 +107,6 @@ df = pd.read_sql("SELECT * FROM raw_hhs_facility;", conn)
 df["date"] = pd.to_datetime(df["collection_week"], errors="coerce")
 df = df.dropna(subset=["date"])
 
-# ---------------------------
-# Detect numeric columns from DB
-# ---------------------------
-cursor.execute("""
-    SELECT column_name
-    FROM information_schema.columns
-    WHERE table_name = 'raw_hhs_facility'
-    AND data_type = 'double precision';
-""")
-
-numeric_cols = [row[0] for row in cursor.fetchall()]
-
 # ---------------------------
 # Normalize numeric fields
 # ---------------------------
@@ -47,20 +114,8 @@ for col in numeric_cols:
     if col in df.columns:
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
-# ---------------------------
-# Structural guards
-# ---------------------------
-if "total_icu_beds_7_day_avg" in df.columns:
-    df = df[df["total_icu_beds_7_day_avg"] > 0]
-
-if "inpatient_beds_7_day_avg" in df.columns:
-    df = df[df["inpatient_beds_7_day_avg"] > 0]
-
-# ---------------------------
-# Keep last 120 weeks per hospital
-# ---------------------------
+# Oldest first, so the latest row wins when de-duplicating below
 df = df.sort_values("date")
-df = df.groupby("hospital_pk").tail(120)
 
 print(f"Rows after cleaning: {len(df)}")
 
@@ -68,44 +123,43 @@ print(f"Rows after cleaning: {len(df)}")
 # Prepare clean table insert
 # ---------------------------
 
-# Get clean table columns
-cursor.execute("""
-    SELECT column_name
-    FROM information_schema.columns
-    WHERE table_name = 'ma_hospital_daily_clean';
-""")
-
-clean_cols = [row[0] for row in cursor.fetchall()]
-
 # Ensure only matching columns are inserted
 df = df[[col for col in df.columns if col in clean_cols]]
 
+# A single set-based upsert cannot touch the same key twice; keep the
+# last row per key, as the old row-by-row upserts effectively did
+df = df.drop_duplicates(subset=["hospital_pk", "date"], keep="last")
+
 cols = df.columns.tolist()
-placeholders = ",".join(["%s"] * len(cols))
+col_list = ",".join(cols)
 
 insert_query = f"""
-INSERT INTO ma_hospital_daily_clean ({",".join(cols)})
-VALUES ({placeholders})
+INSERT INTO ma_hospital_daily_clean ({col_list})
+SELECT {col_list} FROM stage_clean
 ON CONFLICT (hospital_pk, date)
 DO UPDATE SET
 {",".join([f"{c}=EXCLUDED.{c}" for c in cols if c not in ["hospital_pk", "date"]])};
 """
 
-records = df.to_dict("records")
-
 # ---------------------------
-# Insert in chunks
+# Bulk load: COPY into a staging table, then one upsert
 # ---------------------------
-chunk_size = 1000
-
-for i in range(0, len(records), chunk_size):
-    values = [
-        tuple(record[col] for col in cols)
-        for record in records[i:i+chunk_size]
-    ]
-    cursor.executemany(insert_query, values)
-    conn.commit()
-    print(f"Upserted up to {min(i + chunk_size, len(records))}")
+cursor.execute("""
+    CREATE TEMP TABLE stage_clean
+    (LIKE ma_hospital_daily_clean INCLUDING DEFAULTS)
+    ON COMMIT DROP;
+""")
+
+buf = io.StringIO()
+df.to_csv(buf, index=False, header=False)  # NaN -> empty field -> NULL
+buf.seek(0)
+
+cursor.copy_expert(
+    f"COPY stage_clean ({col_list}) FROM STDIN WITH (FORMAT csv)", buf
+)
+cursor.execute(insert_query)
+conn.commit()
+print(f"Upserted {len(df)} rows")
 
 cursor.close()
 conn.close()
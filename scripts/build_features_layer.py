@@ -1,43 +1,64 @@
 import os
+import numpy as np
 import pandas as pd
 import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found")
 
+def group_lag(values: np.ndarray, groups: np.ndarray, k: int) -> np.ndarray:
+    # values[i - k], or NaN where that row belongs to another group.
+    # Rows must be sorted by group so each group is contiguous.
+    lagged = np.full(len(values), np.nan)
+    if k < len(values):
+        lagged[k:] = values[:-k]
+        lagged[k:][groups[k:] != groups[:-k]] = np.nan
+    return lagged
+
 def build_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values(["hospital_pk", "date"])
+    # assign/sort_values return new frames, so the caller's df is not mutated
+    df = (
+        df.assign(date=pd.to_datetime(df["date"]))
+        .sort_values(["hospital_pk", "date"])
+    )
 
     # numeric safety
     for c in ["icu_occupancy_rate", "inpatient_occupancy_rate", "covid_icu_burden_rate"]:
         if c in df.columns:
             df[c] = pd.to_numeric(df[c], errors="coerce")
 
-    g = df.groupby("hospital_pk", group_keys=False)
+    # single sorted pass instead of one groupby traversal per feature
+    values = df["icu_occupancy_rate"].to_numpy(dtype=float)
+    groups = pd.factorize(df["hospital_pk"])[0]
 
     # lags
-    for k in [1, 2, 3, 4]:
-        df[f"lag_{k}"] = g["icu_occupancy_rate"].shift(k)
+    lags = np.column_stack([group_lag(values, groups, k) for k in [1, 2, 3, 4]])
+    new_cols = {f"lag_{k}": lags[:, k - 1] for k in [1, 2, 3, 4]}
 
-    # rolling (use past only)
-    df["roll_mean_4"] = g["icu_occupancy_rate"].shift(1).rolling(4).mean()
-    df["roll_std_4"]  = g["icu_occupancy_rate"].shift(1).rolling(4).std()
-    df["roll_min_4"]  = g["icu_occupancy_rate"].shift(1).rolling(4).min()
-    df["roll_max_4"]  = g["icu_occupancy_rate"].shift(1).rolling(4).max()
+    # rolling (use past only): the 4-week window before each row is
+    # exactly lag_1..lag_4, NaN unless all four are in the same hospital
+    new_cols["roll_mean_4"] = lags.mean(axis=1)
+    new_cols["roll_std_4"] = lags.std(axis=1, ddof=1)
+    new_cols["roll_min_4"] = lags.min(axis=1)
+    new_cols["roll_max_4"] = lags.max(axis=1)
 
     # dynamics
-    df["delta_1"] = df["icu_occupancy_rate"] - df["lag_1"]
-    df["pct_change_1"] = (df["icu_occupancy_rate"] - df["lag_1"]) / df["lag_1"]
+    lag_1 = new_cols["lag_1"]
+    new_cols["delta_1"] = values - lag_1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        new_cols["pct_change_1"] = (values - lag_1) / lag_1
+
+    # add all feature columns in one step
+    df = df.assign(**new_cols)
 
     # clean infinities
-    df.replace([float("inf"), float("-inf")], pd.NA, inplace=True)
+    numeric_cols = df.select_dtypes(include="number").columns
+    df[numeric_cols] = df[numeric_cols].replace([np.inf, -np.inf], np.nan)
 
     # drop rows where we cannot train/predict because no lag history
     df = df.dropna(subset=["lag_1", "roll_mean_4"])
@@ -60,7 +81,14 @@ def main():
     cursor = conn.cursor()
     print("Connected to DB for feature engineering.")
 
-    df = pd.read_sql("SELECT * FROM ma_hospital_daily_clean;", conn)
+    df = pd.read_sql(
+        """
+        SELECT hospital_pk, date,
+               icu_occupancy_rate, inpatient_occupancy_rate, covid_icu_burden_rate
+        FROM ma_hospital_daily_clean;
+        """,
+        conn
+    )
     if df.empty:
         raise ValueError("ma_hospital_daily_clean is empty")
 
@@ -78,7 +106,7 @@ def main():
         delta_1, pct_change_1,
         created_at
     )
-    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    VALUES %s
     ON CONFLICT (hospital_pk, date)
     DO UPDATE SET
         icu_occupancy_rate = EXCLUDED.icu_occupancy_rate,
@@ -97,25 +125,12 @@ def main():
         created_at = EXCLUDED.created_at;
     """
 
-    rows = [
-        (
-            r.hospital_pk, r.date.date(),
-            float(r.icu_occupancy_rate),
-            float(r.inpatient_occupancy_rate) if pd.notna(r.inpatient_occupancy_rate) else None,
-            float(r.covid_icu_burden_rate) if pd.notna(r.covid_icu_burden_rate) else None,
-            float(r.lag_1), float(r.lag_2), float(r.lag_3), float(r.lag_4),
-            float(r.roll_mean_4),
-            float(r.roll_std_4) if pd.notna(r.roll_std_4) else None,
-            float(r.roll_min_4),
-            float(r.roll_max_4),
-            float(r.delta_1),
-            float(r.pct_change_1) if pd.notna(r.pct_change_1) else None,
-            r.created_at
-        )
-        for r in feats.itertuples(index=False)
-    ]
+    # NaN -> None in bulk; columns are already in insert order
+    feats = feats.assign(date=feats["date"].dt.date)
+    out = feats.astype(object).where(feats.notna(), None)
+    rows = list(out.itertuples(index=False, name=None))
 
-    execute_batch(cursor, insert_query, rows, page_size=1000)
+    execute_values(cursor, insert_query, rows, page_size=1000)
     conn.commit()
     cursor.close()
     conn.close()
@@ -5,7 +5,8 @@ import numpy as np
 import psycopg2
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from psycopg2.extras import execute_batch
+from model_cache import load_cached_model, save_cached_model, training_key
+from psycopg2.extras import execute_values
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split, GridSearchCV
 from xgboost import XGBRegressor
@@ -31,23 +32,32 @@ FEATURE_COLS = [
 
 TARGET_COL = "icu_occupancy_rate"
 
+XGB_PARAMS = {
+    "objective": "reg:squarederror",
+    "tree_method": "hist",
+    # GridSearchCV runs the fits in parallel; one thread per fit
+    # avoids oversubscribing the cores
+    "n_jobs": 1,
+    "random_state": 42
+}
+
+PARAM_GRID = {
+    "max_depth": [3,4],
+    "learning_rate": [0.03, 0.05],
+    "n_estimators": [200,300],
+    "subsample": [0.8],
+    "colsample_bytree": [0.8]
+}
+
 # ---------------------------
 # Utilities
 # ---------------------------
 def prepare_xy(df):
-    df = df.copy()
-
-    # Ensure datetime safety
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    # Force numeric conversion
-    for col in FEATURE_COLS + [TARGET_COL]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
+    # Expects numeric columns already coerced (see main)
     df = df.dropna(subset=[TARGET_COL])
 
-    X = df[FEATURE_COLS].fillna(0.0)
+    # XGBoost bins features as float32 internally; hand it float32 directly
+    X = df[FEATURE_COLS].fillna(0.0).astype(np.float32)
     y = df[TARGET_COL]
 
     return X, y
@@ -58,14 +68,15 @@ def prepare_xy(df):
 # ---------------------------
 def train_and_evaluate_group_holdout(df_features):
 
-    hospitals = df_features["hospital_pk"].unique()
+    # Split hospital codes, then mask rows by code instead of hashing ids
+    codes, hospitals = pd.factorize(df_features["hospital_pk"])
 
     train_hospitals, val_hospitals = train_test_split(
-        hospitals, test_size=0.2, random_state=42
+        np.arange(len(hospitals)), test_size=0.2, random_state=42
     )
 
-    train_df = df_features[df_features["hospital_pk"].isin(train_hospitals)]
-    val_df = df_features[df_features["hospital_pk"].isin(val_hospitals)]
+    train_df = df_features[np.isin(codes, train_hospitals)]
+    val_df = df_features[np.isin(codes, val_hospitals)]
 
     X_train, y_train = prepare_xy(train_df)
     X_val, y_val = prepare_xy(val_df)
@@ -73,22 +84,11 @@ def train_and_evaluate_group_holdout(df_features):
     print("\nFeature dtypes:")
     print(X_train.dtypes)
 
-    base_model = XGBRegressor(
-        objective="reg:squarederror",
-        random_state=42
-    )
-
-    param_grid = {
-        "max_depth": [3,4],
-        "learning_rate": [0.03, 0.05],
-        "n_estimators": [200,300],
-        "subsample": [0.8],
-        "colsample_bytree": [0.8]
-    }
+    base_model = XGBRegressor(**XGB_PARAMS)
 
     grid = GridSearchCV(
         base_model,
-        param_grid,
+        PARAM_GRID,
         cv=3,
         scoring="neg_mean_absolute_error",
         n_jobs=-1
@@ -121,11 +121,22 @@ def load_or_train_model(df_features):
         print("Loading existing model...")
         return joblib.load(MODEL_PATH)
 
+    cache_key = training_key(df_features, {
+        "features": FEATURE_COLS,
+        "target": TARGET_COL,
+        "params": XGB_PARAMS,
+        "grid": PARAM_GRID
+    })
+    model = load_cached_model(MODEL_VERSION, cache_key)
+    if model is not None:
+        return model
+
     print("Training XGBoost model with hospital holdout...")
     model = train_and_evaluate_group_holdout(df_features)
 
     os.makedirs("models", exist_ok=True)
     joblib.dump(model, MODEL_PATH)
+    save_cached_model(model, MODEL_VERSION, cache_key)
     print(f"Model saved to {MODEL_PATH}")
 
     return model
@@ -134,53 +145,59 @@ def load_or_train_model(df_features):
 # ---------------------------
 # Recursive Forecast
 # ---------------------------
-def recursive_forecast(model, hospital_df, steps=4):
+LAG_IDX = [FEATURE_COLS.index(f"lag_{k}") for k in [1, 2, 3, 4]]
+ROLL_MEAN_IDX = FEATURE_COLS.index("roll_mean_4")
+ROLL_STD_IDX = FEATURE_COLS.index("roll_std_4")
+ROLL_MIN_IDX = FEATURE_COLS.index("roll_min_4")
+ROLL_MAX_IDX = FEATURE_COLS.index("roll_max_4")
+DELTA_IDX = FEATURE_COLS.index("delta_1")
+PCT_CHANGE_IDX = FEATURE_COLS.index("pct_change_1")
+
+def recursive_forecast(model, df_features, steps=4):
+    """
+    Forecast every hospital at once: one (H, features) state matrix built
+    from each hospital's latest row, one batched predict per step.
+    Returns (hospital_pk, forecast_date, prediction) tuples.
+    """
 
     forecasts = []
 
-    hospital_df = hospital_df.copy()
-    hospital_df["date"] = pd.to_datetime(hospital_df["date"], errors="coerce")
-    hospital_df = hospital_df.sort_values("date")
+    latest = (
+        df_features.assign(date=pd.to_datetime(df_features["date"], errors="coerce"))
+        .dropna(subset=["date"])
+        .sort_values(["hospital_pk", "date"])
+        .drop_duplicates(subset=["hospital_pk"], keep="last")
+    )
 
-    latest_row = hospital_df.iloc[-1].copy()
-    current_date = pd.to_datetime(latest_row["date"])
+    hospital_ids = latest["hospital_pk"].tolist()
+    current_dates = latest["date"]
+    state = latest[FEATURE_COLS].fillna(0.0).to_numpy(dtype=float)
 
     for step in range(1, steps + 1):
 
-        X = latest_row[FEATURE_COLS].fillna(0.0).values.reshape(1, -1)
-        pred = float(model.predict(X)[0])
-
-        pred *= SCENARIO_MULTIPLIER
-        pred = max(0.0, min(pred, 1.2))
-
-        forecast_date = current_date + timedelta(weeks=step)
-        forecasts.append((forecast_date.date(), pred))
-
-        # Update lag chain
-        latest_row["lag_4"] = latest_row["lag_3"]
-        latest_row["lag_3"] = latest_row["lag_2"]
-        latest_row["lag_2"] = latest_row["lag_1"]
-        latest_row["lag_1"] = pred
-
-        lags = [
-            latest_row["lag_1"],
-            latest_row["lag_2"],
-            latest_row["lag_3"],
-            latest_row["lag_4"],
-        ]
-
-        latest_row["roll_mean_4"] = np.mean(lags)
-        latest_row["roll_std_4"] = np.std(lags)
-        latest_row["roll_min_4"] = np.min(lags)
-        latest_row["roll_max_4"] = np.max(lags)
-        latest_row["delta_1"] = latest_row["lag_1"] - latest_row["lag_2"]
-
-        if latest_row["lag_2"] != 0:
-            latest_row["pct_change_1"] = (
-                latest_row["lag_1"] - latest_row["lag_2"]
-            ) / latest_row["lag_2"]
-        else:
-            latest_row["pct_change_1"] = 0.0
+        preds = model.predict(state).astype(float)
+        preds = np.clip(preds * SCENARIO_MULTIPLIER, 0.0, 1.2)
+
+        forecast_dates = (current_dates + timedelta(weeks=step)).dt.date
+        forecasts.extend(zip(hospital_ids, forecast_dates, preds.tolist()))
+
+        # Update lag chain: lag_4 <- lag_3 <- lag_2 <- lag_1 <- pred
+        state[:, LAG_IDX[1:]] = state[:, LAG_IDX[:-1]]
+        state[:, LAG_IDX[0]] = preds
+
+        lags = state[:, LAG_IDX]
+        lag_1, lag_2 = lags[:, 0], lags[:, 1]
+
+        state[:, ROLL_MEAN_IDX] = lags.mean(axis=1)
+        state[:, ROLL_STD_IDX] = lags.std(axis=1)
+        state[:, ROLL_MIN_IDX] = lags.min(axis=1)
+        state[:, ROLL_MAX_IDX] = lags.max(axis=1)
+        state[:, DELTA_IDX] = lag_1 - lag_2
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            state[:, PCT_CHANGE_IDX] = np.where(
+                lag_2 != 0, (lag_1 - lag_2) / lag_2, 0.0
+            )
 
     return forecasts
 
@@ -195,27 +212,33 @@ def main():
 
     print("Connected to DB for forecasting.")
 
-    df_features = pd.read_sql("SELECT * FROM ma_hospital_features;", conn)
+    df_features = pd.read_sql(
+        f"""
+        SELECT hospital_pk, date, {", ".join(FEATURE_COLS)}, {TARGET_COL}
+        FROM ma_hospital_features
+        ORDER BY hospital_pk, date;
+        """,
+        conn
+    )
 
     if df_features.empty:
         raise ValueError("Feature table empty")
 
-    model = load_or_train_model(df_features)
-
-    results = []
+    # Force numeric conversion once for training and forecasting
+    numeric_cols = FEATURE_COLS + [TARGET_COL]
+    df_features[numeric_cols] = df_features[numeric_cols].apply(
+        pd.to_numeric, errors="coerce"
+    )
 
-    for hospital_id, hospital_df in df_features.groupby("hospital_pk"):
+    model = load_or_train_model(df_features)
 
-        forecasts = recursive_forecast(model, hospital_df, steps=4)
+    created_at = datetime.utcnow()
 
-        for forecast_date, pred_value in forecasts:
-            results.append((
-                hospital_id,
-                forecast_date,
-                float(pred_value),
-                MODEL_VERSION,
-                datetime.utcnow()
-            ))
+    results = [
+        (hospital_id, forecast_date, pred_value, MODEL_VERSION, created_at)
+        for hospital_id, forecast_date, pred_value
+        in recursive_forecast(model, df_features, steps=4)
+    ]
 
     insert_query = """
     INSERT INTO ma_hospital_forecast (
@@ -225,7 +248,7 @@ def main():
         model_version,
         created_at
     )
-    VALUES (%s,%s,%s,%s,%s)
+    VALUES %s
     ON CONFLICT (hospital_pk, forecast_date)
     DO UPDATE SET
         predicted_icu_occupancy = EXCLUDED.predicted_icu_occupancy,
@@ -233,7 +256,7 @@ def main():
         created_at = EXCLUDED.created_at;
     """
 
-    execute_batch(cursor, insert_query, results, page_size=1000)
+    execute_values(cursor, insert_query, results, page_size=10_000)
     conn.commit()
 
     cursor.close()
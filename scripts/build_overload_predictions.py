@@ -5,7 +5,8 @@ import numpy as np
 import psycopg2
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from psycopg2.extras import execute_batch
+from model_cache import load_cached_model, save_cached_model, training_key
+from psycopg2.extras import execute_values
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_auc_score
@@ -41,25 +42,32 @@ STRESS_OVERLOAD_THRESHOLD = 75.0
 # keep fixed for stability; you can later tune
 PROB_THRESHOLD = 0.35
 
+RF_PARAMS = {
+    "n_estimators": 500,
+    "max_depth": 12,
+    "min_samples_leaf": 10,
+    "class_weight": {0: 1, 1: 2},
+    "random_state": 42,
+    "n_jobs": -1
+}
+
 # ---------------------------
 # Helpers
 # ---------------------------
 def prepare_xy(df: pd.DataFrame):
-    df = df.copy()
-
-    # Ensure numeric
-    for col in FEATURE_COLS + ["stress_next"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
+    # Expects numeric columns already coerced (see read_stress_features)
     # Need stress_next to create label
     df = df.dropna(subset=["stress_next"])
 
-    df["overload_next"] = (df["stress_next"] >= STRESS_OVERLOAD_THRESHOLD).astype(int)
+    df = df.assign(
+        overload_next=(df["stress_next"] >= STRESS_OVERLOAD_THRESHOLD).astype(int)
+    )
 
     # Need minimum lag features
     df = df.dropna(subset=["stress_lag2"])
 
-    X = df[FEATURE_COLS].fillna(0.0)
+    # RandomForest converts inputs to float32 internally; skip the extra copy
+    X = df[FEATURE_COLS].fillna(0.0).astype(np.float32)
     y = df["overload_next"].astype(int)
 
     return X, y, df
@@ -71,28 +79,23 @@ def train_and_eval_hospital_holdout(df: pd.DataFrame):
     Prevents training & validation mixing across hospitals.
     """
 
-    hospitals = df["hospital_pk"].dropna().unique()
+    # Split hospital codes, then mask rows by code instead of hashing ids
+    # (missing hospital_pk gets code -1 and lands in neither split)
+    codes, hospitals = pd.factorize(df["hospital_pk"])
     if len(hospitals) < 5:
         raise ValueError("Not enough hospitals for holdout split.")
 
     train_h, val_h = train_test_split(
-        hospitals, test_size=0.2, random_state=42
+        np.arange(len(hospitals)), test_size=0.2, random_state=42
     )
 
-    train_df = df[df["hospital_pk"].isin(train_h)]
-    val_df = df[df["hospital_pk"].isin(val_h)]
+    train_df = df[np.isin(codes, train_h)]
+    val_df = df[np.isin(codes, val_h)]
 
     X_train, y_train, _ = prepare_xy(train_df)
     X_val, y_val, _ = prepare_xy(val_df)
 
-    model = RandomForestClassifier(
-        n_estimators=500,
-        max_depth=12,
-        min_samples_leaf=10,
-        class_weight={0: 1, 1: 2},
-        random_state=42,
-        n_jobs=-1
-    )
+    model = RandomForestClassifier(**RF_PARAMS)
 
     model.fit(X_train, y_train)
 
@@ -122,16 +125,63 @@ def train_and_eval_hospital_holdout(df: pd.DataFrame):
     return model
 
 
-def load_or_train(df: pd.DataFrame):
+def read_stress_features(conn, latest_only=False):
+    """
+    Pull stress features, coerced and ordered by hospital/date.
+    latest_only keeps just each hospital's most recent week (done in SQL).
+    """
+    if latest_only:
+        query = f"""
+        SELECT DISTINCT ON (hospital_pk)
+               hospital_pk, date, {", ".join(FEATURE_COLS)}, stress_next
+        FROM ma_stress_features
+        WHERE hospital_pk IS NOT NULL AND date IS NOT NULL
+        ORDER BY hospital_pk, date DESC;
+        """
+    else:
+        query = f"""
+        SELECT hospital_pk, date, {", ".join(FEATURE_COLS)}, stress_next
+        FROM ma_stress_features
+        ORDER BY hospital_pk, date;
+        """
+
+    df = pd.read_sql(query, conn)
+
+    # Ensure numeric once, for training and inference
+    numeric_cols = FEATURE_COLS + ["stress_next"]
+    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+
+    # Make sure date is valid and ordered
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["hospital_pk", "date"])
+    df = df.sort_values(["hospital_pk", "date"])
+
+    return df
+
+
+def load_or_train(conn):
     if (not RETRAIN_MODEL) and os.path.exists(MODEL_PATH):
         print("Loading existing overload model...")
         return joblib.load(MODEL_PATH)
 
+    # Full history is only needed to train
+    df = read_stress_features(conn)
+
+    cache_key = training_key(df, {
+        "features": FEATURE_COLS,
+        "stress_threshold": STRESS_OVERLOAD_THRESHOLD,
+        "params": RF_PARAMS
+    })
+    model = load_cached_model(MODEL_VERSION, cache_key)
+    if model is not None:
+        return model
+
     print("Training RandomForest overload model...")
     model = train_and_eval_hospital_holdout(df)
 
     os.makedirs("models", exist_ok=True)
     joblib.dump(model, MODEL_PATH)
+    save_cached_model(model, MODEL_VERSION, cache_key)
     print(f"Model saved to {MODEL_PATH}")
 
     return model
@@ -146,44 +196,32 @@ def main():
 
     print("Connected to DB for overload predictions.")
 
-    # Pull stress features
-    df = pd.read_sql("SELECT * FROM ma_stress_features;", conn)
+    # Latest week per hospital is all inference needs
+    df = read_stress_features(conn, latest_only=True)
     if df.empty:
         raise ValueError("ma_stress_features is empty. Run build_stress_features.py first.")
 
-    # Make sure date is valid and ordered
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["hospital_pk", "date"])
-    df = df.sort_values(["hospital_pk", "date"])
-
-    model = load_or_train(df)
-
-    # Build one-step-ahead (next week) overload prediction per hospital
-    results = []
-
-    for hospital_pk, hdf in df.groupby("hospital_pk"):
-        hdf = hdf.sort_values("date")
-
-        latest = hdf.iloc[-1].copy()
-
-        # Need features present; if missing, skip
-        feat = latest[FEATURE_COLS]
-        feat = pd.to_numeric(feat, errors="coerce").fillna(0.0).values.reshape(1, -1)
+    model = load_or_train(conn)
 
-        prob = float(model.predict_proba(feat)[0][1])
-        flag = int(prob >= PROB_THRESHOLD)
+    # One-step-ahead (next week) overload prediction for every hospital
+    # in a single batched call; df already holds one row per hospital
+    feats = df[FEATURE_COLS].fillna(0.0).to_numpy(dtype=np.float32)
+    probs = model.predict_proba(feats)[:, 1].astype(float)
+    flags = (probs >= PROB_THRESHOLD).astype(int)
 
-        forecast_date = (pd.to_datetime(latest["date"]) + timedelta(weeks=1)).date()
+    forecast_dates = (df["date"] + timedelta(weeks=1)).dt.date
+    created_at = datetime.utcnow()
+    n = len(df)
 
-        results.append((
-            str(hospital_pk),
-            forecast_date,
-            prob,
-            flag,
-            float(PROB_THRESHOLD),
-            MODEL_VERSION,
-            datetime.utcnow()
-        ))
+    results = list(zip(
+        df["hospital_pk"].astype(str).tolist(),
+        forecast_dates.tolist(),
+        probs.tolist(),
+        flags.tolist(),
+        [float(PROB_THRESHOLD)] * n,
+        [MODEL_VERSION] * n,
+        [created_at] * n
+    ))
 
     # Upsert into table
     insert_query = """
@@ -196,7 +234,7 @@ def main():
         model_version,
         created_at
     )
-    VALUES (%s,%s,%s,%s,%s,%s,%s)
+    VALUES %s
     ON CONFLICT (hospital_pk, forecast_date)
     DO UPDATE SET
         overload_probability = EXCLUDED.overload_probability,
@@ -206,7 +244,7 @@ def main():
         created_at = EXCLUDED.created_at;
     """
 
-    execute_batch(cur, insert_query, results, page_size=1000)
+    execute_values(cur, insert_query, results, page_size=10_000)
     conn.commit()
 
     cur.close()
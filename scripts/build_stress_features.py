@@ -4,7 +4,7 @@ import numpy as np
 import psycopg2
 from datetime import datetime
 from dotenv import load_dotenv
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -18,7 +18,14 @@ def main():
 
     print("Building ma_stress_features...")
 
-    df = pd.read_sql("SELECT * FROM ma_hospital_daily_clean;", conn)
+    df = pd.read_sql(
+        """
+        SELECT hospital_pk, date,
+               icu_occupancy_rate, inpatient_occupancy_rate, covid_icu_burden_rate
+        FROM ma_hospital_daily_clean;
+        """,
+        conn
+    )
     if df.empty:
         raise ValueError("ma_hospital_daily_clean is empty")
 
@@ -26,7 +33,6 @@ def main():
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     df = df.dropna(subset=["hospital_pk", "date"])
 
-    # Ensure numeric
     # Ensure numeric
     ratio_cols = [
         "icu_occupancy_rate",
@@ -43,15 +49,21 @@ def main():
     df = df[df["icu_occupancy_rate"] >= 0]
 
     # --- Core ratios (already engineered in clean layer) ---
-    df["icu_util"] = clamp01(df["icu_occupancy_rate"])
-    df["inpatient_util"] = clamp01(df["inpatient_occupancy_rate"])
-    df["covid_ratio"] = clamp01(df["covid_icu_burden_rate"])
-
-    df = df.replace([np.inf, -np.inf], np.nan).fillna(0)
+    # clamped to [0, 1]; missing ratios count as 0
+    icu_util, inpatient_util, covid_ratio = (
+        np.nan_to_num(clamp01(df[c].to_numpy(dtype=float)), nan=0.0)
+        for c in ratio_cols
+    )
+    df = df.assign(
+        icu_util=icu_util,
+        inpatient_util=inpatient_util,
+        covid_ratio=covid_ratio
+    )
 
     # --- Trend Features ---
+    # Frame is presorted; one groupby (sort=False) serves every shift/rolling
     df = df.sort_values(["hospital_pk", "date"])
-    g = df.groupby("hospital_pk")
+    g = df.groupby("hospital_pk", sort=False)
 
     df["icu_util_lag1"] = g["icu_util"].shift(1)
     df["icu_util_lag2"] = g["icu_util"].shift(2)
@@ -59,18 +71,21 @@ def main():
     df["icu_delta_1w"] = (df["icu_util"] - df["icu_util_lag1"]).clip(-0.3, 0.3)
     df["icu_delta_2w"] = (df["icu_util"] - df["icu_util_lag2"]).clip(-0.3, 0.3)
 
+    # Plain arrays for the score math (row order matches the sorted frame)
+    icu = df["icu_util"].to_numpy()
+    inp = df["inpatient_util"].to_numpy()
+    cov = df["covid_ratio"].to_numpy()
+    delta = df["icu_delta_1w"].fillna(0).to_numpy()
+
     # --- Oxygen Proxy ---
-    df["oxygen_risk_proxy"] = clamp01(
-        0.6 * df["icu_util"] +
-        0.2 * df["inpatient_util"] +
-        0.2 * df["covid_ratio"]
-    )
+    oxygen = clamp01(0.6 * icu + 0.2 * inp + 0.2 * cov)
+    df["oxygen_risk_proxy"] = oxygen
 
     # --- Stress Score ---
     df["stress"] = (
-        0.5 * df["icu_util"] * 100 +
-        0.3 * df["oxygen_risk_proxy"] * 100 +
-        0.2 * clamp01(df["icu_delta_1w"].fillna(0) / 0.10) * 100
+        0.5 * icu * 100 +
+        0.3 * oxygen * 100 +
+        0.2 * clamp01(delta / 0.10) * 100
     )
 
     df["stress_next"] = g["stress"].shift(-1)
@@ -80,9 +95,14 @@ def main():
     df["stress_lag2"] = g["stress"].shift(2)
     df["stress_delta_1w"] = df["stress"] - df["stress_lag1"]
 
-    df["stress_roll3"] = g["stress"].transform(lambda x: x.shift(1).rolling(3).mean())
-    df["stress_roll6"] = g["stress"].transform(lambda x: x.shift(1).rolling(6).mean())
-    df["stress_roll6_std"] = g["stress"].transform(lambda x: x.shift(1).rolling(6).std())
+    # Rolling over past weeks only: roll the per-hospital lag directly
+    # instead of a Python lambda per group
+    past = g["stress_lag1"]
+    roll3 = past.rolling(3)
+    roll6 = past.rolling(6)
+    df["stress_roll3"] = roll3.mean().reset_index(level=0, drop=True)
+    df["stress_roll6"] = roll6.mean().reset_index(level=0, drop=True)
+    df["stress_roll6_std"] = roll6.std().reset_index(level=0, drop=True)
 
     hospital_mean = g["stress"].transform("mean")
     df["stress_centered"] = df["stress"] - hospital_mean
@@ -106,9 +126,11 @@ def main():
         "weekofyear","weekofyear_sin","weekofyear_cos"
     ]].copy()
 
+    df_out["date"] = df_out["date"].dt.date
     df_out["created_at"] = datetime.utcnow()
 
-    records = list(df_out.itertuples(index=False, name=None))
+    # one object-array pass instead of per-row itertuples boxing
+    records = list(map(tuple, df_out.to_numpy().tolist()))
 
     insert = """
     INSERT INTO ma_stress_features (
@@ -123,7 +145,7 @@ def main():
       weekofyear, weekofyear_sin, weekofyear_cos,
       created_at
     )
-    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    VALUES %s
     ON CONFLICT (hospital_pk, date)
     DO UPDATE SET
       icu_util=EXCLUDED.icu_util,
@@ -150,7 +172,7 @@ def main():
       created_at=EXCLUDED.created_at;
     """
 
-    execute_batch(cur, insert, records, page_size=1000)
+    execute_values(cur, insert, records, page_size=2_500)
     conn.commit()
     cur.close()
     conn.close()
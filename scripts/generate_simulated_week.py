@@ -1,5 +1,4 @@
 import psycopg2
-import random
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
@@ -25,45 +24,41 @@ def main():
     print(f"Last week: {last_week}")
     print(f"New week: {new_week}")
 
-    # Pull all rows from latest week
-    cur.execute("""
-        SELECT *
-        FROM raw_hhs_facility
-        WHERE collection_week = %s;
-    """, (last_week,))
-
-    rows = cur.fetchall()
+    # Column list only; the copy itself runs inside Postgres
+    cur.execute("SELECT * FROM raw_hhs_facility LIMIT 0;")
     colnames = [desc[0] for desc in cur.description]
 
+    select_exprs = []
+    for col in colnames:
+        if col == "collection_week":
+            # Update collection_week
+            select_exprs.append("%(new_week)s")
+        elif col == "icu_beds_used_7_day_avg" and "total_icu_beds_7_day_avg" in colnames:
+            # Modify ICU values slightly: noise uniform in [-0.05, 0.08),
+            # result kept within [0, total ICU beds]
+            select_exprs.append("""
+                CASE
+                    WHEN total_icu_beds_7_day_avg <> 0 AND icu_beds_used_7_day_avg <> 0
+                    THEN GREATEST(0, LEAST(
+                        total_icu_beds_7_day_avg,
+                        icu_beds_used_7_day_avg * (1 + (random() * 0.13 - 0.05))
+                    ))
+                    ELSE icu_beds_used_7_day_avg
+                END
+            """)
+        else:
+            select_exprs.append(col)
+
+    # Copy the latest week forward in one statement
     insert_query = f"""
         INSERT INTO raw_hhs_facility ({",".join(colnames)})
-        VALUES ({",".join(["%s"] * len(colnames))});
+        SELECT {",".join(select_exprs)}
+        FROM raw_hhs_facility
+        WHERE collection_week = %(last_week)s;
     """
 
-    for row in rows:
-        row = list(row)
-
-        # Update collection_week
-        week_idx = colnames.index("collection_week")
-        row[week_idx] = new_week
-
-        # Modify ICU values slightly
-        try:
-            total_icu_idx = colnames.index("total_icu_beds_7_day_avg")
-            used_icu_idx = colnames.index("icu_beds_used_7_day_avg")
-
-            total_icu = row[total_icu_idx]
-            used_icu = row[used_icu_idx]
-
-            if total_icu and used_icu:
-                noise = random.uniform(-0.05, 0.08)
-                new_used = max(0, min(total_icu, used_icu * (1 + noise)))
-                row[used_icu_idx] = new_used
-
-        except ValueError:
-            pass
-
-        cur.execute(insert_query, tuple(row))
+    cur.execute(insert_query, {"new_week": new_week, "last_week": last_week})
+    print(f"Inserted {cur.rowcount} simulated rows")
 
     conn.commit()
     conn.close()
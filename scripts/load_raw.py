@@ -1,3 +1,4 @@
+import io
 import os
 import pandas as pd
 import psycopg2
@@ -92,28 +93,21 @@ df = df[[col for col in df.columns if col in db_cols]]
 
 print(f"Columns being inserted: {len(df.columns)}")
 
-records = df.to_dict("records")
 cols = df.columns.tolist()
-placeholders = ",".join(["%s"] * len(cols))
-
-insert_query = f"""
-INSERT INTO raw_hhs_facility ({",".join(cols)})
-VALUES ({placeholders});
-"""
 
 # ---------------------------
-# Insert in chunks
+# Bulk load with COPY
 # ---------------------------
-chunk_size = 500
+buf = io.StringIO()
+df.to_csv(buf, index=False, header=False)  # NaN/None -> empty field -> NULL
+buf.seek(0)
 
-for i in range(0, len(records), chunk_size):
-    values = [
-        tuple(record[col] for col in cols)
-        for record in records[i:i+chunk_size]
-    ]
-    cursor.executemany(insert_query, values)
-    conn.commit()
-    print(f"Inserted up to {min(i + chunk_size, len(records))}")
+cursor.copy_expert(
+    f"COPY raw_hhs_facility ({','.join(cols)}) FROM STDIN WITH (FORMAT csv)",
+    buf
+)
+conn.commit()
+print(f"Inserted {len(df)} rows")
 
 cursor.close()
 conn.close()
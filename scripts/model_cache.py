@@ -0,0 +1,43 @@
+import glob
+import hashlib
+import json
+import os
+import joblib
+import pandas as pd
+
+# Gitignored; holds one cached model per trainer
+CACHE_DIR = "models/cache"
+
+def training_key(df, config):
+    """
+    Content hash of a training frame plus the config that trains on it.
+    Same rows (in the same order) and same config give the same key.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+def _cache_path(name, key):
+    return os.path.join(CACHE_DIR, f"{name}_{key}.pkl")
+
+
+def load_cached_model(name, key):
+    """Return the model cached under name/key, or None"""
+    path = _cache_path(name, key)
+    if not os.path.exists(path):
+        return None
+    print(f"Training inputs unchanged; loading cached model {path}")
+    return joblib.load(path)
+
+
+def save_cached_model(model, name, key):
+    """Cache model under name/key, replacing any superseded cache for name"""
+    path = _cache_path(name, key)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # "?" per key char, so "<name>_<key>" never matches a longer name
+    for old in glob.glob(_cache_path(name, "?" * len(key))):
+        if old != path:
+            os.remove(old)
+    joblib.dump(model, path)
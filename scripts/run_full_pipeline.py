@@ -1,5 +1,6 @@
 import subprocess
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import psycopg2
 import os
 from dotenv import load_dotenv
@@ -17,6 +18,37 @@ def run_step(name, script):
     print(result.stdout)
     print(f"{name} completed in {round(time.time() - start, 2)}s")
 
+# step -> (name, script, steps it depends on)
+PIPELINE_STEPS = {
+    "clean": ("Build Clean Layer", "scripts/build_clean_layer.py", []),
+    "stress": ("Build Stress Features", "scripts/build_stress_features.py", ["clean"]),
+    "forecast": ("Train & Build Forecast", "scripts/build_forecast_layer.py", ["stress"]),
+    # both trainers already use every core (n_jobs=-1), so overload
+    # training waits for the forecast instead of competing with it
+    "overload": ("Build Overload Predictions", "scripts/build_overload_layer.py", ["stress", "forecast"]),
+    # alerts read the forecast table, so they wait for it
+    "oxygen": ("Build Oxygen Alerts", "scripts/build_oxygen_alert_layer.py", ["stress", "forecast"]),
+}
+
+def run_pipeline(steps, max_workers=2):
+    # Each step runs in its own subprocess; threads only wait on them.
+    # A step starts as soon as all of its dependencies have finished.
+    done = set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(done) < len(steps):
+            for key, (name, script, deps) in steps.items():
+                ready = all(dep in done for dep in deps)
+                if ready and key not in done and key not in running.values():
+                    running[executor.submit(run_step, name, script)] = key
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                future.result()  # re-raises the step's failure
+                done.add(key)
+
 def print_summary():
     conn = psycopg2.connect(DATABASE_URL)
     cur = conn.cursor()
@@ -47,11 +79,7 @@ def main():
     print("\n🚀 Starting Full Pipeline Run")
     start_time = time.time()
 
-    run_step("Build Clean Layer", "scripts/build_clean_layer.py")
-    run_step("Build Stress Features", "scripts/build_stress_features.py")
-    run_step("Train & Build Forecast", "scripts/build_forecast_layer.py")
-    run_step("Build Overload Predictions", "scripts/build_overload_layer.py")
-    run_step("Build Oxygen Alerts", "scripts/build_oxygen_alert_layer.py")
+    run_pipeline(PIPELINE_STEPS)
 
     print_summary()
 